@@ -1,15 +1,25 @@
 import pathlib
 import json
 import yaml
-import re
 import csv
 import os
 import argparse
+import heapq
 import json
 from pathlib import Path
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Dict, List, Set, Optional, Union, Any
 from enum import Enum
+from itertools import islice
+from operator import itemgetter
+
+# Prefer the libyaml-backed C loader/dumper, fall back to pure Python
+try:
+    from yaml import CSafeLoader as _YLoader, CSafeDumper as _YDumper
+except ImportError:
+    from yaml import SafeLoader as _YLoader, SafeDumper as _YDumper
 
 class RadicalType(Enum):
     SEMANTIC = "semantic"  # Provides meaning
@@ -27,7 +37,27 @@ class StrokeType(Enum):
     RISING = "提"          # Rising stroke
     BEND = "折"            # Bent stroke
 
-@dataclass
+# Value -> member maps, cheaper than Enum.__call__ when parsing many files
+_STROKE_MAP = {m.value: m for m in StrokeType}
+_RADICAL_TYPE_MAP = {m.value: m for m in RadicalType}
+
+def _stroke_type(value: Any) -> StrokeType:
+    """Look up a StrokeType by value, raising the same ValueError as StrokeType(value)"""
+    try:
+        return _STROKE_MAP[value]
+    except (KeyError, TypeError):
+        raise ValueError(f"{value!r} is not a valid StrokeType") from None
+
+# Minimum number of notes before load_data parses them on a thread pool
+_PARALLEL_LOAD_MIN_FILES = 1000
+
+# Anki TSV export: sanitizer for tabs/newlines embedded in free-text fields
+_TSV_SANITIZE = str.maketrans({"\t": " ", "\n": " ", "\r": " "})
+
+# Empty writing cells for one row of the practice sheet grid
+_PRACTICE_CELLS = '\n            <div class="practice-cell"></div>' * 10
+
+@dataclass(slots=True)
 class Radical:
     """Representation of a Chinese radical"""
     character: str         # The radical character itself
@@ -39,7 +69,7 @@ class Radical:
     common_characters: List[str] = field(default_factory=list)
     mnemonic: str = ""     # Memory aid for this radical
 
-@dataclass
+@dataclass(slots=True)
 class Character:
     """Representation of a Chinese character"""
     character: str         # The character itself
@@ -64,132 +94,174 @@ class ChineseCharacterSystem:
         self.vscode_dir = pathlib.Path(vscode_dir)
         self.obsidian_dir = pathlib.Path(obsidian_dir)
         
+        # Note directories per output target: (root, VS Code, Obsidian)
+        self._radical_dirs = tuple(d / "radicals" for d in (self.root_dir, self.vscode_dir, self.obsidian_dir))
+        self._character_dirs = tuple(d / "characters" for d in (self.root_dir, self.vscode_dir, self.obsidian_dir))
+        
         # Ensure directories exist
-        self.root_dir.mkdir(parents=True, exist_ok=True)
-        self.vscode_dir.mkdir(parents=True, exist_ok=True)
-        self.obsidian_dir.mkdir(parents=True, exist_ok=True)
+        for directory in self._radical_dirs + self._character_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
         
         # Data stores
         self.radicals: Dict[str, Radical] = {}
         self.characters: Dict[str, Character] = {}
         self.radical_index: Dict[str, Set[str]] = {}  # Radical -> Set of characters containing it
+        self._search_blob: Dict[str, str] = {}  # Character -> lowercased pinyin/meaning/tags
         
         # Load existing data
         self.load_data()
     
     def load_data(self):
         """Load existing character and radical data"""
+        radical_paths = self._list_markdown_files(self.root_dir / "radicals")
+        char_paths = self._list_markdown_files(self.root_dir / "characters")
+        if not radical_paths and not char_paths:
+            return
+        
+        # YAML parsing holds the GIL, so threads only overlap the file reads;
+        # that pays off for large vaults on multi-core machines, not otherwise
+        cpu_count = os.cpu_count() or 1
+        if cpu_count > 1 and len(radical_paths) + len(char_paths) >= _PARALLEL_LOAD_MIN_FILES:
+            with ThreadPoolExecutor(max_workers=min(8, cpu_count)) as executor:
+                radicals = list(executor.map(self._parse_radical_file, radical_paths))
+                characters = list(executor.map(self._parse_character_file, char_paths))
+        else:
+            radicals = [self._parse_radical_file(path) for path in radical_paths]
+            characters = [self._parse_character_file(path) for path in char_paths]
+        
         # Load radicals
-        radical_dir = self.root_dir / "radicals"
-        if radical_dir.exists():
-            for file_path in radical_dir.glob("*.md"):
-                radical = self._parse_radical_file(file_path)
-                if radical:
-                    self.radicals[radical.character] = radical
+        for radical in radicals:
+            if radical:
+                self.radicals[radical.character] = radical
         
         # Load characters
-        char_dir = self.root_dir / "characters"
-        if char_dir.exists():
-            for file_path in char_dir.glob("*.md"):
-                character = self._parse_character_file(file_path)
-                if character:
-                    self.characters[character.character] = character
-                    
-                    # Update radical index
-                    for radical in character.radicals:
-                        if radical not in self.radical_index:
-                            self.radical_index[radical] = set()
-                        self.radical_index[radical].add(character.character)
+        radical_index = defaultdict(set, self.radical_index)
+        for character in characters:
+            if character:
+                # A note for an already-loaded character replaces it; drop its
+                # old radicals so the index only references current entries
+                previous = self.characters.get(character.character)
+                if previous:
+                    for radical in previous.radicals:
+                        chars = radical_index[radical]
+                        chars.discard(character.character)
+                        if not chars:
+                            del radical_index[radical]
+                
+                self.characters[character.character] = character
+                
+                # Update radical index
+                for radical in character.radicals:
+                    radical_index[radical].add(character.character)
+                
+                self._index_search(character)
+        self.radical_index = dict(radical_index)
     
-    def _parse_radical_file(self, file_path: pathlib.Path) -> Optional[Radical]:
+    def _list_markdown_files(self, directory: pathlib.Path) -> List[str]:
+        """List the markdown files directly inside a directory"""
+        if not directory.exists():
+            return []
+        with os.scandir(directory) as it:
+            return [entry.path for entry in it
+                    if entry.name.endswith(".md") and entry.is_file()]
+    
+    def _parse_radical_file(self, file_path: Union[str, pathlib.Path]) -> Optional[Radical]:
         """Parse a radical markdown file"""
         try:
-            content = file_path.read_text(encoding="utf-8")
+            with open(file_path, "rb") as f:
+                content = f.read().decode("utf-8")
+            if "\r" in content:
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
             
             # Extract YAML frontmatter
-            yaml_match = re.search(r"^---\n(.*?)\n---", content, re.DOTALL)
-            if yaml_match:
-                frontmatter = yaml.safe_load(yaml_match.group(1))
-                
-                # Create Radical object
-                radical = Radical(
-                    character=frontmatter.get("character", ""),
-                    pinyin=frontmatter.get("pinyin", ""),
-                    meaning=frontmatter.get("meaning", ""),
-                    type=RadicalType(frontmatter.get("type", "unknown")),
-                    strokes=frontmatter.get("strokes", 0),
-                    mnemonic=frontmatter.get("mnemonic", "")
-                )
-                
-                # Parse stroke order if available
-                stroke_order = frontmatter.get("stroke_order", [])
-                if stroke_order:
-                    radical.stroke_order = [StrokeType(s) for s in stroke_order]
-                
-                # Parse common characters if available
-                common_chars = frontmatter.get("common_characters", [])
-                if common_chars:
-                    radical.common_characters = common_chars
-                
-                return radical
+            if not content.startswith("---\n"):
+                return None
+            end = content.find("\n---", 4)
+            if end < 0:
+                return None
+            frontmatter = yaml.load(content[4:end], Loader=_YLoader)
             
-            return None
+            # Create Radical object
+            radical = Radical(
+                character=frontmatter.get("character", ""),
+                pinyin=frontmatter.get("pinyin", ""),
+                meaning=frontmatter.get("meaning", ""),
+                type=_RADICAL_TYPE_MAP.get(frontmatter.get("type", "unknown"), RadicalType.UNKNOWN),
+                strokes=frontmatter.get("strokes", 0),
+                mnemonic=frontmatter.get("mnemonic", "")
+            )
+            
+            # Parse stroke order if available
+            stroke_order = frontmatter.get("stroke_order", [])
+            if stroke_order:
+                radical.stroke_order = [_stroke_type(s) for s in stroke_order]
+            
+            # Parse common characters if available
+            common_chars = frontmatter.get("common_characters", [])
+            if common_chars:
+                radical.common_characters = common_chars
+            
+            return radical
         except Exception as e:
             print(f"Error parsing radical file {file_path}: {e}")
             return None
     
-    def _parse_character_file(self, file_path: pathlib.Path) -> Optional[Character]:
+    def _parse_character_file(self, file_path: Union[str, pathlib.Path]) -> Optional[Character]:
         """Parse a character markdown file"""
         try:
-            content = file_path.read_text(encoding="utf-8")
+            with open(file_path, "rb") as f:
+                content = f.read().decode("utf-8")
+            if "\r" in content:
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
             
             # Extract YAML frontmatter
-            yaml_match = re.search(r"^---\n(.*?)\n---", content, re.DOTALL)
-            if yaml_match:
-                frontmatter = yaml.safe_load(yaml_match.group(1))
-                
-                # Create Character object
-                character = Character(
-                    character=frontmatter.get("character", ""),
-                    pinyin=frontmatter.get("pinyin", ""),
-                    tone=frontmatter.get("tone", 0),
-                    meaning=frontmatter.get("meaning", []),
-                    radicals=frontmatter.get("radicals", []),
-                    strokes=frontmatter.get("strokes", 0),
-                    hsk_level=frontmatter.get("hsk_level", 0),
-                    frequency_rank=frontmatter.get("frequency_rank", 0),
-                    mnemonic=frontmatter.get("mnemonic", "")
-                )
-                
-                # Parse stroke order if available
-                stroke_order = frontmatter.get("stroke_order", [])
-                if stroke_order:
-                    character.stroke_order = [StrokeType(s) for s in stroke_order]
-                
-                # Parse components if available
-                components = frontmatter.get("components", [])
-                if components:
-                    character.components = components
-                
-                # Parse example words if available
-                example_words = frontmatter.get("example_words", [])
-                if example_words:
-                    character.example_words = example_words
-                
-                # Parse tags if available
-                tags = frontmatter.get("tags", [])
-                if tags:
-                    character.tags = tags
-                
-                return character
+            if not content.startswith("---\n"):
+                return None
+            end = content.find("\n---", 4)
+            if end < 0:
+                return None
+            frontmatter = yaml.load(content[4:end], Loader=_YLoader)
             
-            return None
+            # Create Character object
+            character = Character(
+                character=frontmatter.get("character", ""),
+                pinyin=frontmatter.get("pinyin", ""),
+                tone=frontmatter.get("tone", 0),
+                meaning=frontmatter.get("meaning", []),
+                radicals=frontmatter.get("radicals", []),
+                strokes=frontmatter.get("strokes", 0),
+                hsk_level=frontmatter.get("hsk_level", 0),
+                frequency_rank=frontmatter.get("frequency_rank", 0),
+                mnemonic=frontmatter.get("mnemonic", "")
+            )
+            
+            # Parse stroke order if available
+            stroke_order = frontmatter.get("stroke_order", [])
+            if stroke_order:
+                character.stroke_order = [_stroke_type(s) for s in stroke_order]
+            
+            # Parse components if available
+            components = frontmatter.get("components", [])
+            if components:
+                character.components = components
+            
+            # Parse example words if available
+            example_words = frontmatter.get("example_words", [])
+            if example_words:
+                character.example_words = example_words
+            
+            # Parse tags if available
+            tags = frontmatter.get("tags", [])
+            if tags:
+                character.tags = tags
+            
+            return character
         except Exception as e:
             print(f"Error parsing character file {file_path}: {e}")
             return None
     
-    def add_radical(self, radical: Radical) -> bool:
-        """Add a new radical to the system"""
+    def add_radical(self, radical: Radical, persist: bool = True) -> bool:
+        """Add a new radical to the system, writing its notes unless persist is False"""
         if radical.character in self.radicals:
             print(f"Radical {radical.character} already exists")
             return False
@@ -198,11 +270,12 @@ class ChineseCharacterSystem:
         self.radicals[radical.character] = radical
         
         # Write to file
-        self._save_radical(radical)
+        if persist:
+            self._save_radical(radical)
         return True
     
-    def add_character(self, character: Character) -> bool:
-        """Add a new character to the system"""
+    def add_character(self, character: Character, persist: bool = True) -> bool:
+        """Add a new character to the system, writing its notes unless persist is False"""
         if character.character in self.characters:
             print(f"Character {character.character} already exists")
             return False
@@ -212,18 +285,22 @@ class ChineseCharacterSystem:
         
         # Update radical index
         for radical in character.radicals:
-            if radical not in self.radical_index:
-                self.radical_index[radical] = set()
-            self.radical_index[radical].add(character.character)
+            self.radical_index.setdefault(radical, set()).add(character.character)
+        
+        self._index_search(character)
         
         # Write to file
-        self._save_character(character)
+        if persist:
+            self._save_character(character)
         return True
     
     def _save_radical(self, radical: Radical):
         """Save a radical to its markdown file"""
-        radical_dir = self.root_dir / "radicals"
-        radical_dir.mkdir(parents=True, exist_ok=True)
+        radical_dir, vscode_radical_dir, obsidian_radical_dir = self._radical_dirs
+        
+        # Joined fields reused across output variants
+        common_chars_str = ', '.join(radical.common_characters)
+        stroke_str = ' → '.join(stroke.value for stroke in radical.stroke_order)
         
         # Create frontmatter
         frontmatter = {
@@ -241,9 +318,10 @@ class ChineseCharacterSystem:
         if radical.common_characters:
             frontmatter["common_characters"] = radical.common_characters
         
-        # Prepare content
-        content = f"""---
-{yaml.dump(frontmatter, allow_unicode=True)}---
+        # Sections shared by every output variant
+        yaml_block = yaml.dump(frontmatter, Dumper=_YDumper, allow_unicode=True, sort_keys=False)
+        header = f"""---
+{yaml_block}---
 
 # {radical.character} - {radical.meaning}
 
@@ -253,50 +331,33 @@ class ChineseCharacterSystem:
 - **Strokes**: {radical.strokes}
 
 ## Mnemonic
-{radical.mnemonic}
-
-## Common Characters
-{', '.join(radical.common_characters)}
+"""
+        stroke_section = f"""
 
 ## Stroke Order
-{' → '.join([stroke.value for stroke in radical.stroke_order])}
+{stroke_str}
 """
         
+        # Prepare content
+        content = (header + f"""{radical.mnemonic}
+
+## Common Characters
+{common_chars_str}""" + stroke_section).encode("utf-8")
+        
         # Write to file
         file_path = radical_dir / f"{radical.character}.md"
-        file_path.write_text(content, encoding="utf-8")
+        file_path.write_bytes(content)
         
         # Create VS Code version (could be the same or customized)
-        vscode_radical_dir = self.vscode_dir / "radicals"
-        vscode_radical_dir.mkdir(parents=True, exist_ok=True)
         vscode_file_path = vscode_radical_dir / f"{radical.character}.md"
-        vscode_file_path.write_text(content, encoding="utf-8")
-        
-        # Create Obsidian version (with potential Obsidian-specific formatting)
-        obsidian_radical_dir = self.obsidian_dir / "radicals"
-        obsidian_radical_dir.mkdir(parents=True, exist_ok=True)
+        vscode_file_path.write_bytes(content)
         
-        # Add Obsidian-specific content (e.g., callouts, links to related notes)
-        obsidian_content = f"""---
-{yaml.dump(frontmatter, allow_unicode=True)}---
-
-# {radical.character} - {radical.meaning}
-
-## Overview
-- **Pinyin**: {radical.pinyin}
-- **Type**: {radical.type.value}
-- **Strokes**: {radical.strokes}
-
-## Mnemonic
-> [!hint] Memory Aid
+        # Create Obsidian version (callouts, links to related notes)
+        obsidian_content = header + f"""> [!hint] Memory Aid
 > {radical.mnemonic}
 
 ## Common Characters
-{', '.join([f"[[{char}]]" for char in radical.common_characters])}
-
-## Stroke Order
-{' → '.join([stroke.value for stroke in radical.stroke_order])}
-
+{', '.join([f"[[{char}]]" for char in radical.common_characters])}""" + stroke_section + f"""
 ## Practice
 ![[{radical.character}_stroke_order.gif]]
 
@@ -308,12 +369,17 @@ class ChineseCharacterSystem:
 """
         
         obsidian_file_path = obsidian_radical_dir / f"{radical.character}.md"
-        obsidian_file_path.write_text(obsidian_content, encoding="utf-8")
+        obsidian_file_path.write_bytes(obsidian_content.encode("utf-8"))
     
     def _save_character(self, character: Character):
         """Save a character to its markdown file"""
-        char_dir = self.root_dir / "characters"
-        char_dir.mkdir(parents=True, exist_ok=True)
+        char_dir, vscode_char_dir, obsidian_char_dir = self._character_dirs
+        
+        # Joined fields reused across output variants
+        meaning_str = ', '.join(character.meaning)
+        radicals_str = ', '.join(character.radicals)
+        components_str = ', '.join(character.components)
+        stroke_str = ' → '.join(stroke.value for stroke in character.stroke_order)
         
         # Create frontmatter
         frontmatter = {
@@ -344,42 +410,42 @@ class ChineseCharacterSystem:
         if character.frequency_rank:
             frontmatter["frequency_rank"] = character.frequency_rank
         
-        # Prepare content
-        content = f"""---
-{yaml.dump(frontmatter, allow_unicode=True)}---
+        # Sections shared by every output variant
+        yaml_block = yaml.dump(frontmatter, Dumper=_YDumper, allow_unicode=True, sort_keys=False)
+        header = f"""---
+{yaml_block}---
 
-# {character.character} - {', '.join(character.meaning)}
+# {character.character} - {meaning_str}
 
 ## Overview
 - **Pinyin**: {character.pinyin} (Tone {character.tone})
-- **Radicals**: {', '.join(character.radicals)}
-- **Components**: {', '.join(character.components)}
-- **Strokes**: {character.strokes}
+"""
+        details = f"""- **Strokes**: {character.strokes}
 - **HSK Level**: {character.hsk_level or "N/A"}
 - **Frequency Rank**: {character.frequency_rank or "N/A"}
 
 ## Mnemonic
-{character.mnemonic}
+"""
+        example_lines = "".join(
+            f"- {word['word']} ({word['pinyin']}): {word['meaning']}\n" for word in character.example_words
+        )
+        body = f"""
 
 ## Example Words
-"""
-        
-        for word in character.example_words:
-            content += f"- {word['word']} ({word['pinyin']}): {word['meaning']}\n"
-        
-        content += """
+{example_lines}
 ## Stroke Order
-"""
-        content += ' → '.join([stroke.value for stroke in character.stroke_order])
+{stroke_str}"""
+        
+        # Prepare content
+        content = header + f"""- **Radicals**: {radicals_str}
+- **Components**: {components_str}
+""" + details + character.mnemonic + body
         
         # Write to file
         file_path = char_dir / f"{character.character}.md"
-        file_path.write_text(content, encoding="utf-8")
+        file_path.write_bytes(content.encode("utf-8"))
         
         # Create VS Code version (with code snippets and extended metadata)
-        vscode_char_dir = self.vscode_dir / "characters"
-        vscode_char_dir.mkdir(parents=True, exist_ok=True)
-        
         vscode_content = content + f"""
 ## Code Snippet
 ```python
@@ -401,41 +467,12 @@ anki_fields = f"{{character.character}}\\t{{character.pinyin}}\\t{{', '.join(cha
 """
         
         vscode_file_path = vscode_char_dir / f"{character.character}.md"
-        vscode_file_path.write_text(vscode_content, encoding="utf-8")
+        vscode_file_path.write_bytes(vscode_content.encode("utf-8"))
         
         # Create Obsidian version (with flashcards and internal links)
-        obsidian_char_dir = self.obsidian_dir / "characters"
-        obsidian_char_dir.mkdir(parents=True, exist_ok=True)
-        
-        obsidian_content = f"""---
-{yaml.dump(frontmatter, allow_unicode=True)}---
-
-# {character.character} - {', '.join(character.meaning)}
-
-## Overview
-- **Pinyin**: {character.pinyin} (Tone {character.tone})
-- **Radicals**: {', '.join([f"[[radicals/{rad}|{rad}]]" for rad in character.radicals])}
+        obsidian_content = header + f"""- **Radicals**: {', '.join([f"[[radicals/{rad}|{rad}]]" for rad in character.radicals])}
 - **Components**: {', '.join([f"[[{comp}]]" for comp in character.components])}
-- **Strokes**: {character.strokes}
-- **HSK Level**: {character.hsk_level or "N/A"}
-- **Frequency Rank**: {character.frequency_rank or "N/A"}
-
-## Mnemonic
-> [!hint] Memory Aid
-> {character.mnemonic}
-
-## Example Words
-"""
-        
-        for word in character.example_words:
-            obsidian_content += f"- {word['word']} ({word['pinyin']}): {word['meaning']}\n"
-        
-        obsidian_content += """
-## Stroke Order
-"""
-        obsidian_content += ' → '.join([stroke.value for stroke in character.stroke_order])
-        
-        obsidian_content += f"""
+""" + details + "> [!hint] Memory Aid\n> " + character.mnemonic + body + f"""
 
 ## Practice
 ![[{character.character}_stroke_order.gif]]
@@ -444,7 +481,7 @@ anki_fields = f"{{character.character}}\\t{{character.pinyin}}\\t{{', '.join(cha
 > What is the meaning of {character.character}?
 > 
 > > [!success] Answer
-> > {', '.join(character.meaning)}
+> > {meaning_str}
 
 > [!question] Flashcard
 > How do you pronounce {character.character}?
@@ -454,60 +491,67 @@ anki_fields = f"{{character.character}}\\t{{character.pinyin}}\\t{{', '.join(cha
 """
         
         obsidian_file_path = obsidian_char_dir / f"{character.character}.md"
-        obsidian_file_path.write_text(obsidian_content, encoding="utf-8")
+        obsidian_file_path.write_bytes(obsidian_content.encode("utf-8"))
     
     def get_characters_by_radical(self, radical: str) -> List[Character]:
         """Get all characters containing a specific radical"""
-        if radical not in self.radical_index:
+        # radical_index only ever references characters present in self.characters
+        chars = self.radical_index.get(radical)
+        return [self.characters[char] for char in chars] if chars else []
+    
+    def _index_search(self, character: Character):
+        """Cache the lowercased searchable text of a character"""
+        # NUL separators keep substring matches from spanning fields
+        self._search_blob[character.character] = "\0".join(
+            self._search_fields(character.pinyin)
+            + self._search_fields(character.meaning)
+            + self._search_fields(character.tags)
+        ).lower()
+    
+    @staticmethod
+    def _search_fields(value: Any) -> List[str]:
+        """Coerce a hand-edited frontmatter value (None, scalar, or list) to strings"""
+        if value is None:
             return []
-        
-        return [self.characters[char] for char in self.radical_index[radical] 
-                if char in self.characters]
+        if isinstance(value, (list, tuple)):
+            return [str(item) for item in value if item is not None]
+        return [str(value)]
     
     def search_characters(self, query: str) -> List[Character]:
         """Search characters by pinyin, meaning, or tags"""
-        results = []
-        
-        for char in self.characters.values():
-            # Match by character
-            if query in char.character:
-                results.append(char)
-                continue
-            
-            # Match by pinyin
-            if query.lower() in char.pinyin.lower():
-                results.append(char)
-                continue
-            
-            # Match by meaning
-            if any(query.lower() in meaning.lower() for meaning in char.meaning):
-                results.append(char)
-                continue
-            
-            # Match by tags
-            if any(query.lower() in tag.lower() for tag in char.tags):
-                results.append(char)
-                continue
-        
-        return results
+        q = query.lower()
+        return [self.characters[char] for char, blob in self._search_blob.items()
+                if query in char or q in blob]
 
     def generate_anki_deck(self, output_path: pathlib.Path, include_radicals: bool = True) -> bool:
         """Generate an Anki-compatible TSV file for import"""
         try:
             output_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(output_path, "w", encoding="utf-8") as f:
-                # Write header
-                f.write("character\tpinyin\tmeaning\tmnemonic\tradicals\tstrokes\n")
-                
-                # Write character data
-                for char in self.characters.values():
-                    f.write(f"{char.character}\t{char.pinyin}\t{', '.join(char.meaning)}\t{char.mnemonic}\t{', '.join(char.radicals)}\t{char.strokes}\n")
-                
-                # Optionally include radicals
-                if include_radicals:
-                    for radical in self.radicals.values():
-                        f.write(f"{radical.character}\t{radical.pinyin}\t{radical.meaning}\t{radical.mnemonic}\t\t{radical.strokes}\n")
+            # Header
+            lines = ["character\tpinyin\tmeaning\tmnemonic\tradicals\tstrokes\n".encode("utf-8")]
+            
+            # Character data
+            lines.extend(
+                (
+                    f"{char.character}\t{char.pinyin}\t{', '.join(char.meaning).translate(_TSV_SANITIZE)}\t"
+                    f"{str(char.mnemonic).translate(_TSV_SANITIZE)}\t{', '.join(char.radicals)}\t{char.strokes}\n"
+                ).encode("utf-8")
+                for char in self.characters.values()
+            )
+            
+            # Optionally include radicals
+            if include_radicals:
+                lines.extend(
+                    (
+                        f"{radical.character}\t{radical.pinyin}\t{str(radical.meaning).translate(_TSV_SANITIZE)}\t"
+                        f"{str(radical.mnemonic).translate(_TSV_SANITIZE)}\t\t{radical.strokes}\n"
+                    ).encode("utf-8")
+                    for radical in self.radicals.values()
+                )
+            
+            with open(output_path, "wb") as f:
+                f.writelines(lines)
             
             return True
         except Exception as e:
@@ -520,7 +564,7 @@ anki_fields = f"{{character.character}}\\t{{character.pinyin}}\\t{{', '.join(cha
             output_dir.mkdir(parents=True, exist_ok=True)
             
             # Generate HTML practice sheet
-            html_content = """<!DOCTYPE html>
+            parts = ["""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
@@ -538,11 +582,11 @@ anki_fields = f"{{character.character}}\\t{{character.pinyin}}\\t{{', '.join(cha
 </head>
 <body>
     <h1>Chinese Character Practice Sheet</h1>
-"""
+"""]
             
             # Generate practice sheets for each character
-            for char in list(self.characters.values())[:20]:  # Limit to 20 characters per sheet
-                html_content += f"""
+            for char in islice(self.characters.values(), 20):  # Limit to 20 characters per sheet
+                parts.append(f"""
     <div class="character-section">
         <h2>{char.character} - {', '.join(char.meaning)}</h2>
         <p>Pinyin: {char.pinyin} (Tone {char.tone})</p>
@@ -558,30 +602,20 @@ anki_fields = f"{{character.character}}\\t{{character.pinyin}}\\t{{', '.join(cha
         </div>
         
         <h3>Practice Grid</h3>
-        <div class="practice-grid">
-            <div class="practice-cell"></div>
-            <div class="practice-cell"></div>
-            <div class="practice-cell"></div>
-            <div class="practice-cell"></div>
-            <div class="practice-cell"></div>
-            <div class="practice-cell"></div>
-            <div class="practice-cell"></div>
-            <div class="practice-cell"></div>
-            <div class="practice-cell"></div>
-            <div class="practice-cell"></div>
+        <div class="practice-grid">{_PRACTICE_CELLS}
         </div>
     </div>
     <hr>
-"""
+""")
             
-            html_content += """
+            parts.append("""
 </body>
 </html>
-"""
+""")
             
             # Write HTML file
             html_path = output_dir / "practice_sheet.html"
-            html_path.write_text(html_content, encoding="utf-8")
+            html_path.write_text("".join(parts), encoding="utf-8")
             
             # Generate PDF version (would require additional libraries in a real implementation)
             # Here we just note that it would be generated
@@ -604,30 +638,22 @@ anki_fields = f"{{character.character}}\\t{{character.pinyin}}\\t{{', '.join(cha
             "most_common_radicals": []
         }
         
-        # Characters by HSK level
+        # Characters by HSK level and stroke count, in one pass
+        hsk_counts = Counter()
+        stroke_counts = Counter()
         for char in self.characters.values():
-            hsk_level = char.hsk_level or 0
-            if hsk_level not in stats["characters_by_hsk_level"]:
-                stats["characters_by_hsk_level"][hsk_level] = 0
-            stats["characters_by_hsk_level"][hsk_level] += 1
-        
-        # Characters by stroke count
-        for char in self.characters.values():
-            stroke_count = char.strokes
-            if stroke_count not in stats["characters_by_stroke_count"]:
-                stats["characters_by_stroke_count"][stroke_count] = 0
-            stats["characters_by_stroke_count"][stroke_count] += 1
-        
-        # Most common radicals
-        radical_count = {}
-        for radical, chars in self.radical_index.items():
-            radical_count[radical] = len(chars)
-        
-        stats["most_common_radicals"] = sorted(
-            [{"radical": rad, "count": count} for rad, count in radical_count.items()],
-            key=lambda x: x["count"],
-            reverse=True
-        )[:10]  # Top 10
+            hsk_counts[char.hsk_level or 0] += 1
+            stroke_counts[char.strokes] += 1
+        stats["characters_by_hsk_level"] = dict(hsk_counts)
+        stats["characters_by_stroke_count"] = dict(stroke_counts)
+        
+        # Most common radicals (top 10)
+        stats["most_common_radicals"] = [
+            {"radical": rad, "count": count}
+            for rad, count in heapq.nlargest(
+                10, ((rad, len(chars)) for rad, chars in self.radical_index.items()), key=itemgetter(1)
+            )
+        ]
         
         return stats
     
@@ -637,78 +663,93 @@ anki_fields = f"{{character.character}}\\t{{character.pinyin}}\\t{{', '.join(cha
             import csv
             
             count = 0
-            with open(csv_path, "r", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                
-                for row in reader:
-                    # Determine if this is a character or radical
-                    is_radical = row.get("is_radical", "").lower() == "true"
+            new_radicals: List[Radical] = []
+            new_characters: List[Character] = []
+            try:
+                with open(csv_path, "r", encoding="utf-8") as f:
+                    reader = csv.DictReader(f)
                     
-                    if is_radical:
-                        # Create radical
-                        radical = Radical(
-                            character=row.get("character", ""),
-                            pinyin=row.get("pinyin", ""),
-                            meaning=row.get("meaning", ""),
-                            type=RadicalType(row.get("type", "unknown")),
-                            strokes=int(row.get("strokes", 0)),
-                            mnemonic=row.get("mnemonic", "")
-                        )
-                        
-                        # Parse stroke order if available
-                        stroke_order = row.get("stroke_order", "")
-                        if stroke_order:
-                            radical.stroke_order = [StrokeType(s.strip()) for s in stroke_order.split(",")]
-                        
-                        # Parse common characters if available
-                        common_chars = row.get("common_characters", "")
-                        if common_chars:
-                            radical.common_characters = [c.strip() for c in common_chars.split(",")]
-                        
-                        self.add_radical(radical)
-                    else:
-                        # Create character
-                        meaning_list = [m.strip() for m in row.get("meaning", "").split(",")]
-                        radicals_list = [r.strip() for r in row.get("radicals", "").split(",")]
-                        
-                        character = Character(
-                            character=row.get("character", ""),
-                            pinyin=row.get("pinyin", ""),
-                            tone=int(row.get("tone", 0)),
-                            meaning=meaning_list,
-                            radicals=radicals_list,
-                            strokes=int(row.get("strokes", 0)),
-                            mnemonic=row.get("mnemonic", "")
-                        )
-                        
-                        # Parse stroke order if available
-                        stroke_order = row.get("stroke_order", "")
-                        if stroke_order:
-                            character.stroke_order = [StrokeType(s.strip()) for s in stroke_order.split(",")]
+                    for row in reader:
+                        # Determine if this is a character or radical
+                        is_radical = row.get("is_radical", "").lower() == "true"
                         
-                        # Parse components if available
-                        components = row.get("components", "")
-                        if components:
-                            character.components = [c.strip() for c in components.split(",")]
+                        if is_radical:
+                            # Create radical
+                            radical = Radical(
+                                character=row.get("character", ""),
+                                pinyin=row.get("pinyin", ""),
+                                meaning=row.get("meaning", ""),
+                                type=_RADICAL_TYPE_MAP.get(row.get("type", "unknown"), RadicalType.UNKNOWN),
+                                strokes=int(row.get("strokes", 0)),
+                                mnemonic=row.get("mnemonic", "")
+                            )
+                            
+                            # Parse stroke order if available
+                            stroke_order = row.get("stroke_order", "")
+                            if stroke_order:
+                                radical.stroke_order = [_stroke_type(s.strip()) for s in stroke_order.split(",")]
+                            
+                            # Parse common characters if available
+                            common_chars = row.get("common_characters", "")
+                            if common_chars:
+                                radical.common_characters = [c.strip() for c in common_chars.split(",")]
+                            
+                            if self.add_radical(radical, persist=False):
+                                new_radicals.append(radical)
+                        else:
+                            # Create character
+                            meaning_list = [m.strip() for m in row.get("meaning", "").split(",")]
+                            radicals_list = [r.strip() for r in row.get("radicals", "").split(",")]
+                            
+                            character = Character(
+                                character=row.get("character", ""),
+                                pinyin=row.get("pinyin", ""),
+                                tone=int(row.get("tone", 0)),
+                                meaning=meaning_list,
+                                radicals=radicals_list,
+                                strokes=int(row.get("strokes", 0)),
+                                mnemonic=row.get("mnemonic", "")
+                            )
+                            
+                            # Parse stroke order if available
+                            stroke_order = row.get("stroke_order", "")
+                            if stroke_order:
+                                character.stroke_order = [_stroke_type(s.strip()) for s in stroke_order.split(",")]
+                            
+                            # Parse components if available
+                            components = row.get("components", "")
+                            if components:
+                                character.components = [c.strip() for c in components.split(",")]
+                            
+                            # Parse HSK level if available
+                            hsk_level = row.get("hsk_level", "")
+                            if hsk_level and hsk_level.isdigit():
+                                character.hsk_level = int(hsk_level)
+                            
+                            # Parse frequency rank if available
+                            freq_rank = row.get("frequency_rank", "")
+                            if freq_rank and freq_rank.isdigit():
+                                character.frequency_rank = int(freq_rank)
+                            
+                            # Parse tags if available
+                            tags = row.get("tags", "")
+                            if tags:
+                                character.tags = [t.strip() for t in tags.split(",")]
+                            
+                            if self.add_character(character, persist=False):
+                                new_characters.append(character)
                         
-                        # Parse HSK level if available
-                        hsk_level = row.get("hsk_level", "")
-                        if hsk_level and hsk_level.isdigit():
-                            character.hsk_level = int(hsk_level)
-                        
-                        # Parse frequency rank if available
-                        freq_rank = row.get("frequency_rank", "")
-                        if freq_rank and freq_rank.isdigit():
-                            character.frequency_rank = int(freq_rank)
-                        
-                        # Parse tags if available
-                        tags = row.get("tags", "")
-                        if tags:
-                            character.tags = [t.strip() for t in tags.split(",")]
-                        
-                        self.add_character(character)
-                    
-                    count += 1
+                        count += 1
+            finally:
+                # Write all new notes in one batch, including rows added
+                # before a failing row so they are not left unsaved. Every
+                # write is submitted before any result is read, so one failing
+                # note does not keep the others from being written.
+                with ThreadPoolExecutor() as executor:
+                    futures = [executor.submit(self._save_radical, radical) for radical in new_radicals]
+                    futures += [executor.submit(self._save_character, character) for character in new_characters]
+                    for future in futures:
+                        future.result()
             
             return count
         except Exception as e:
@@ -730,21 +771,13 @@ def load_pinyin_chart(csv_path: str):
     Load the pinyin chart CSV without external libraries.
     Handles missing values and maps columns correctly.
     """
-    pinyin_data = []
-    with open(csv_path, "r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        headers = next(reader)  # First row is header
-
-        for row_num, row in enumerate(reader):
-            if not row:
-                continue  # Skip empty lines
-
-            row_data = {}
-            for col_num, value in enumerate(row):
-                col_name = headers[col_num] if col_num < len(headers) else f"col_{col_num}"
-                row_data[col_name] = value.strip() if value.strip() else None
-
-            pinyin_data.append(row_data)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)  # First row is header; blank lines are skipped
+        pinyin_data = [
+            {col_name: (value.strip() or None) if value else None
+             for col_name, value in row.items() if col_name is not None}
+            for row in reader if any(row.values())
+        ]
 
     return pinyin_data
 
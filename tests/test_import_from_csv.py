@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homoHanzi import ChineseCharacterSystem
+
+
+def test_failing_save_does_not_block_other_notes(tmp_path):
+    """A note that fails to save must not keep the rest of the import from being written"""
+    system = ChineseCharacterSystem(tmp_path / "data", tmp_path / "vscode", tmp_path / "obsidian")
+    csv_path = tmp_path / "import.csv"
+    csv_path.write_text(
+        "character,pinyin,meaning,type,strokes,radicals,is_radical\n"
+        "吃,chī,eat,,6,口,false\n"
+        "a/b,x,bad path,semantic,1,,true\n"
+        "喝,hē,drink,,12,口,false\n",
+        encoding="utf-8",
+    )
+
+    # The radical "a/b" cannot be written, so the import reports failure
+    assert system.import_from_csv(csv_path) == 0
+
+    for directory in ("data", "vscode", "obsidian"):
+        char_dir = tmp_path / directory / "characters"
+        assert (char_dir / "吃.md").exists()
+        assert (char_dir / "喝.md").exists()
+
+
+def test_rows_before_a_bad_row_are_written(tmp_path):
+    """Rows added before a malformed row are still persisted"""
+    system = ChineseCharacterSystem(tmp_path / "data", tmp_path / "vscode", tmp_path / "obsidian")
+    csv_path = tmp_path / "import.csv"
+    csv_path.write_text(
+        "character,pinyin,meaning,strokes,radicals\n"
+        "好,hǎo,good,6,女\n"
+        "坏,huài,bad,oops,土\n",
+        encoding="utf-8",
+    )
+
+    assert system.import_from_csv(csv_path) == 0
+    assert (tmp_path / "data" / "characters" / "好.md").exists()
+    assert not (tmp_path / "data" / "characters" / "坏.md").exists()